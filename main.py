@@ -1,14 +1,45 @@
-import json
 from datetime import date, datetime
-from typing import List, Dict, Optional
-from collections import defaultdict
+from functools import lru_cache
+from operator import itemgetter
+import os
+from typing import Callable, List, Dict, NamedTuple, Optional
 import random
 
+import msgspec
+import numpy as np
+import orjson
+from numba import njit
 from fastapi import FastAPI, Query, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import Response
+from pydantic import BaseModel
 from contextlib import asynccontextmanager
 
+# --- msgspec Structs for Fast Data Loading ---
+
+class TransactionRecord(msgspec.Struct):
+    """Internal record for a single financial transaction, as loaded from the data file."""
+    date: date
+    description: str
+    amount: float
+    type: str  # "debit" or "credit"
+    category: str
+    payment_method: str
+
+# Typed decoder that parses and validates the data file in a single pass
+# Lax mode coerces values like "5" into numbers, matching the Pydantic model
+transactions_decoder = msgspec.json.Decoder(List[TransactionRecord], strict=False)
+
+class TransactionArrays(NamedTuple):
+    """Column-wise (struct-of-arrays) view of the transactions, used for analytics."""
+    amounts: np.ndarray  # int64 paise (1/100 of a rupee) if amount_scale is 100, else float64 rupees
+    amount_scale: int  # Units per rupee in `amounts`
+    is_debit: np.ndarray  # bool
+    is_credit: np.ndarray  # bool
+    cat_ids: np.ndarray  # intp, indexes into `categories`
+    categories: List[str]
+    dates_ord: np.ndarray  # int32, proleptic Gregorian ordinals
+
 # --- Pydantic Models for Data Structure and Validation ---
 
 class Transaction(BaseModel):
@@ -18,7 +49,7 @@ class Transaction(BaseModel):
     amount: float
     type: str  # "debit" or "credit"
     category: str
-    payment_method: str = Field(..., alias="payment_method")
+    payment_method: str
 
 class SummaryResponse(BaseModel):
     """Data model for the analytics summary endpoint."""
@@ -48,11 +79,36 @@ class TipsResponse(BaseModel):
 # --- In-memory "Database" ---
 # This dictionary will hold our application's state, loaded at startup.
 app_state = {
-    "transactions": []
+    "transactions": [],
+    "transactions_json": b"[]",
+    "transaction_arrays": None,
+    "analytics": (0, 0, {}, 0),
+    "spend_by_category_r2": {},
+    "tips_template": {}
 }
 
 # --- Lifespan Management (Startup/Shutdown Events) ---
 
+def load_state(transactions: List[TransactionRecord]):
+    """
+    Stores the transactions and precomputes everything the endpoints serve from them.
+    Transactions are only loaded at startup; if they ever become mutable, call this on every write.
+    """
+    arrays = build_transaction_arrays(transactions)
+    analytics = calculate_analytics(arrays)
+    _, _, spend_by_category, _ = analytics
+    # Only the dopamine boost changes between /tips requests, so prebuild everything else.
+    tips = build_tips(spend_by_category, len(transactions))
+
+    app_state["transactions"] = transactions
+    app_state["transactions_json"] = msgspec.json.encode(transactions)
+    app_state["transaction_arrays"] = arrays
+    app_state["analytics"] = analytics
+    app_state["spend_by_category_r2"] = {k: round(v, 2) for k, v in spend_by_category.items()}
+    app_state["tips_template"] = TipsResponse(daily_dopamine_boost="", personalized_tips=tips).model_dump()
+    # Cached summaries were built from the previous analytics
+    build_summary.cache_clear()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -61,17 +117,18 @@ async def lifespan(app: FastAPI):
     """
     print("🦊 App starting up! Loading transaction data...")
     try:
-        with open("mock_transactions.json", "r") as f:
-            transactions_data = json.load(f)
-            # Use Pydantic to parse and validate data on load
-            app_state["transactions"] = [Transaction(**t) for t in transactions_data]
-        print(f"✅ Loaded {len(app_state['transactions'])} transactions successfully.")
+        with open("mock_transactions.json", "rb") as f:
+            transactions = transactions_decoder.decode(f.read())
+        print(f"✅ Loaded {len(transactions)} transactions successfully.")
     except FileNotFoundError:
         print("⚠️ WARNING: mock_transactions.json not found. The app will run with no data.")
-        app_state["transactions"] = []
+        transactions = []
     except Exception as e:
         print(f"🚨 ERROR: Failed to load or parse mock_transactions.json: {e}")
-        app_state["transactions"] = []
+        transactions = []
+
+    # Outside the try, so bugs in the precompute fail startup loudly instead of serving no data
+    load_state(transactions)
     
     yield  # The application runs while the lifespan context is active
     
@@ -89,57 +146,106 @@ app = FastAPI(
 )
 
 # Enable CORS (Cross-Origin Resource Sharing) to allow frontend access
+# In production, set CORS_ALLOW_ORIGINS to the frontend domains, e.g. "https://app.example.com"
+cors_allow_origins = [o.strip() for o in os.getenv("CORS_ALLOW_ORIGINS", "*").split(",") if o.strip()]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Allows all origins for development
+    allow_origins=cors_allow_origins,  # Allows all origins by default for development
     allow_credentials=True,
-    allow_methods=["*"],  # Allows all methods
-    allow_headers=["*"],  # Allows all headers
+    allow_methods=["GET"],  # The API is read-only
+    allow_headers=["content-type", "authorization"],
+    max_age=86400,  # Let browsers cache preflight responses for a day
 )
 
 # --- Helper Functions for Analytics ---
 
-def calculate_analytics(transactions: List[Transaction]):
-    """Calculates core analytics from a list of transactions."""
-    if not transactions:
-        return 0, 0, {}, 0
-        
-    total_spend = sum(t.amount for t in transactions if t.type == 'debit')
-    total_income = sum(t.amount for t in transactions if t.type == 'credit')
-    
-    spend_by_category = defaultdict(float)
-    for t in transactions:
-        if t.type == 'debit':
-            spend_by_category[t.category] += t.amount
-            
-    first_date = min(t.date for t in transactions)
-    last_date = max(t.date for t in transactions)
-    period_days = (last_date - first_date).days + 1  # Inclusive of the first day
-    
-    return total_spend, total_income, dict(spend_by_category), period_days
+def build_transaction_arrays(transactions: List[TransactionRecord]) -> TransactionArrays:
+    """Converts a list of transactions into parallel NumPy arrays."""
+    n = len(transactions)
+    types = [t.type for t in transactions]
 
+    # Store whole paise when that is lossless, so quantizing never changes the totals;
+    # amounts with finer precision, or whose sum could exceed 2**53 paise, stay as float rupees
+    # (bounding the sum keeps every int64 accumulator exact and cleanly convertible to float)
+    amounts = np.fromiter((t.amount for t in transactions), dtype=np.float64, count=n)
+    paise = np.rint(amounts * 100)
+    amount_scale = 1
+    if np.abs(paise).sum() < 2**53 and np.array_equal(paise / 100, amounts):
+        amounts, amount_scale = paise.astype(np.int64), 100
 
-# --- API Endpoints ---
+    # Encode category names as small ints, in order of first appearance
+    cat_to_id: Dict[str, int] = {}
+    cat_ids = np.fromiter(
+        (cat_to_id.setdefault(t.category, len(cat_to_id)) for t in transactions),
+        dtype=np.intp,
+        count=n,
+    )
 
-@app.get("/transactions", response_model=List[Transaction])
-async def get_all_transactions():
-    """
-    Retrieves all transactions from the mock data.
-    This is the raw data feed for the frontend.
-    """
-    return app_state["transactions"]
+    return TransactionArrays(
+        amounts=amounts,
+        amount_scale=amount_scale,
+        is_debit=np.fromiter((ty == 'debit' for ty in types), dtype=bool, count=n),
+        is_credit=np.fromiter((ty == 'credit' for ty in types), dtype=bool, count=n),
+        cat_ids=cat_ids,
+        categories=list(cat_to_id),
+        dates_ord=np.fromiter((t.date.toordinal() for t in transactions), dtype=np.int32, count=n),
+    )
 
-@app.get("/summary", response_model=SummaryResponse)
-async def get_summary(monthly_income: float = Query(..., gt=0, description="User's total monthly income.")):
+@njit(cache=True)
+def _analytics_kernel(amounts, is_debit, is_credit, cat_ids, dates_ord, n_cats):
+    """Computes all analytics accumulators in a single fused pass over the arrays."""
+    sums = np.zeros(n_cats, dtype=amounts.dtype)
+    spend = sums.dtype.type(0)
+    income = sums.dtype.type(0)
+    counts = np.zeros(n_cats, dtype=np.int64)
+    dmin = dates_ord[0]
+    dmax = dates_ord[0]
+    for i in range(amounts.shape[0]):
+        a = amounts[i]
+        if is_debit[i]:
+            spend += a
+            sums[cat_ids[i]] += a
+            counts[cat_ids[i]] += 1
+        elif is_credit[i]:
+            income += a
+        d = dates_ord[i]
+        if d < dmin:
+            dmin = d
+        elif d > dmax:  # A new minimum can never also be a new maximum
+            dmax = d
+    return spend, income, sums, counts, dmin, dmax
+
+def calculate_analytics(arrays: TransactionArrays):
+    """Calculates core analytics from the column-wise transaction arrays."""
+    if arrays.amounts.size == 0:
+        return 0, 0, {}, 0
+
+    spend, income, sums, counts, first_day, last_day = _analytics_kernel(
+        arrays.amounts,
+        arrays.is_debit,
+        arrays.is_credit,
+        arrays.cat_ids,
+        arrays.dates_ord,
+        len(arrays.categories),
+    )
+    # Zip the per-id accumulators back to category names (in rupees), skipping ids with no debits
+    spend_by_category = {
+        name: total / arrays.amount_scale
+        for name, total, count in zip(arrays.categories, sums.tolist(), counts.tolist())
+        if count
+    }
+    period_days = int(last_day - first_day) + 1  # Inclusive of the first day
+
+    scale = arrays.amount_scale
+    return spend / scale, income / scale, spend_by_category, period_days
+
+@lru_cache(maxsize=1024)
+def build_summary(monthly_income: float) -> bytes:
     """
-    Provides a detailed financial summary based on transaction data and user's income.
-    This endpoint powers the main analytics dashboard.
+    Builds the encoded summary response for a given monthly income.
+    Analytics are fixed after startup, so repeat dashboard loads are served from the cache.
     """
-    transactions = app_state["transactions"]
-    if not transactions:
-        raise HTTPException(status_code=404, detail="No transaction data available to generate a summary.")
-
-    total_spend, total_income, spend_by_category, period_days = calculate_analytics(transactions)
+    total_spend, total_income, _, period_days = app_state["analytics"]
 
     daily_spend_rate = total_spend / period_days if period_days > 0 else 0
     monthly_burn_rate = daily_spend_rate * 30
@@ -150,97 +256,140 @@ async def get_summary(monthly_income: float = Query(..., gt=0, description="User
     if daily_spend_rate > 0:
         days_left = int(money_left / daily_spend_rate) if money_left > 0 else 0
 
-    return SummaryResponse(
+    summary = SummaryResponse(
         total_spend=round(total_spend, 2),
         total_income=round(total_income, 2),
         net_flow=round(total_income - total_spend, 2),
-        spend_by_category={k: round(v, 2) for k, v in spend_by_category.items()},
+        spend_by_category=app_state["spend_by_category_r2"],
         monthly_burn_rate_projection=round(monthly_burn_rate, 2),
         money_left_from_income=round(money_left, 2),
         days_until_broke_projection=days_left,
         period_days=period_days
     )
+    return orjson.dumps(summary.model_dump())
 
-@app.get("/tips", response_model=TipsResponse)
-async def get_savings_tips():
-    """
-    Generates AI-powered, personalized savings tips and a dopamine boost message.
-    This endpoint delivers the cute, actionable advice to the user.
-    """
-    transactions = app_state["transactions"]
-    if not transactions:
-        raise HTTPException(status_code=404, detail="No transaction data available to generate tips.")
+# Tip builders for the top spending category, keyed by category name
+CATEGORY_TIP_BUILDERS: Dict[str, Callable[[float], Dict[str, str]]] = {
+    "Food Delivery": lambda amount: {
+        "title": "Level-Up Your Kitchen Game!",
+        "suggestion": f"You're a top foodie, spending ₹{amount:.0f} on deliveries! Try cooking one meal at home this week to save big and feel like a chef.",
+        "emoji": "🍳"
+    },
+    "Shopping": lambda amount: {
+        "title": "Master the 24-Hour Rule",
+        "suggestion": "That shopping haul looks great! Next time you see something you love, try waiting 24 hours before buying. It's a secret trick to avoid impulse buys.",
+        "emoji": "🛍️"
+    },
+    "Going Out": lambda amount: {
+        "title": "Pre-Game Like a Pro",
+        "suggestion": "Fun nights out are the best! You could save a bit by having a drink at home before you head out. Your wallet will be just as happy as you are!",
+        "emoji": "🥂"
+    },
+}
 
-    _, _, spend_by_category, _ = calculate_analytics(transactions)
-    
-    dopamine_boosts = [
-        "You're doing amazing! Every small step is a huge win. ✨",
-        "Look at you, taking control of your finances! We love to see it. 💖",
-        "Keep slaying! Your future self will thank you for this. 🚀",
-        "Remember, you got this! One good choice at a time. 😊",
-        "Building good habits is a superpower. You're a hero! 🦸"
-    ]
+# Dopamine boost messages for /tips, one picked at random per request
+DOPAMINE_BOOSTS = (
+    "You're doing amazing! Every small step is a huge win. ✨",
+    "Look at you, taking control of your finances! We love to see it. 💖",
+    "Keep slaying! Your future self will thank you for this. 🚀",
+    "Remember, you got this! One good choice at a time. 😊",
+    "Building good habits is a superpower. You're a hero! 🦸"
+)
+_n_boosts = len(DOPAMINE_BOOSTS)
+_rng = random.Random()  # Dedicated instance, so picking a boost doesn't go through the module-level RNG
 
+def build_tips(spend_by_category: Dict[str, float], n_transactions: int) -> List[Dict[str, str]]:
+    """
+    Builds the personalized savings tips from the spending breakdown.
+    Transactions are fixed after startup, so this runs once in lifespan.
+    """
     tips = []
     
-    # Sort categories by spending, highest first
-    sorted_spend = sorted(spend_by_category.items(), key=lambda item: item[1], reverse=True)
-
-    # Generate a tip for the top spending category
-    if sorted_spend:
-        top_category, top_amount = sorted_spend[0]
-        if top_category == "Food Delivery":
-            tips.append(Tip(
-                title=f"Level-Up Your Kitchen Game!",
-                suggestion=f"You're a top foodie, spending ₹{top_amount:.0f} on deliveries! Try cooking one meal at home this week to save big and feel like a chef.",
-                emoji="🍳"
-            ))
-        elif top_category == "Shopping":
-            tips.append(Tip(
-                title="Master the 24-Hour Rule",
-                suggestion=f"That shopping haul looks great! Next time you see something you love, try waiting 24 hours before buying. It's a secret trick to avoid impulse buys.",
-                emoji="🛍️"
-            ))
-        elif top_category == "Going Out":
-            tips.append(Tip(
-                title="Pre-Game Like a Pro",
-                suggestion=f"Fun nights out are the best! You could save a bit by having a drink at home before you head out. Your wallet will be just as happy as you are!",
-                emoji="🥂"
-            ))
+    # Generate a tip for the top spending category (only the top one is needed, so no full sort)
+    if spend_by_category:
+        top_category, top_amount = max(spend_by_category.items(), key=itemgetter(1))
+        builder = CATEGORY_TIP_BUILDERS.get(top_category)
+        if builder:
+            tips.append(builder(top_amount))
 
     # Specific tip for 'Sutta' or 'Coffee' if present
     if "Sutta" in spend_by_category:
         amount = spend_by_category["Sutta"]
-        monthly_saving = (amount / len(transactions) * 0.75) * 30 # Rough projection
-        tips.append(Tip(
-            title="Power-Up Your Health & Wallet",
-            suggestion=f"Cutting back on just one sutta a day could save you over ₹{monthly_saving:.0f} a month. Imagine what you could do with that!",
-            emoji="💪"
-        ))
+        monthly_saving = (amount / n_transactions * 0.75) * 30 # Rough projection
+        tips.append({
+            "title": "Power-Up Your Health & Wallet",
+            "suggestion": f"Cutting back on just one sutta a day could save you over ₹{monthly_saving:.0f} a month. Imagine what you could do with that!",
+            "emoji": "💪"
+        })
     
     if "Coffee" in spend_by_category and spend_by_category['Coffee'] > 200:
-        tips.append(Tip(
-            title="Become Your Own Barista",
-            suggestion=f"Your coffee game is strong! Making your own brew a few times a week is not only fun but could easily save you hundreds. You got this!",
-            emoji="☕"
-        ))
+        tips.append({
+            "title": "Become Your Own Barista",
+            "suggestion": f"Your coffee game is strong! Making your own brew a few times a week is not only fun but could easily save you hundreds. You got this!",
+            "emoji": "☕"
+        })
         
     # Add a generic, positive tip
-    tips.append(Tip(
-        title="Check Your Subscriptions",
-        suggestion="Do a quick check of your subscriptions like Netflix, etc. Sometimes we forget what we're paying for! A quick cleanup can unlock easy savings.",
-        emoji="📺"
-    ))
-
-    return TipsResponse(
-        daily_dopamine_boost=random.choice(dopamine_boosts),
-        personalized_tips=tips[:3]  # Return the top 3 most relevant tips
-    )
+    tips.append({
+        "title": "Check Your Subscriptions",
+        "suggestion": "Do a quick check of your subscriptions like Netflix, etc. Sometimes we forget what we're paying for! A quick cleanup can unlock easy savings.",
+        "emoji": "📺"
+    })
+
+    return tips[:3]  # Keep the top 3 most relevant tips
+
+
+# --- API Endpoints ---
+# All heavy work happens once in lifespan; the handlers only serve precomputed data.
+# They stay `async def` on purpose, since moving them to the threadpool would only add a hop per request.
+# They return pre-encoded Response objects, which FastAPI sends as-is; response_model only documents the body.
+
+@app.get("/transactions", response_model=List[Transaction])
+async def get_all_transactions():
+    """
+    Retrieves all transactions from the mock data.
+    This is the raw data feed for the frontend.
+    """
+    return Response(content=app_state["transactions_json"], media_type="application/json")
+
+@app.get("/summary", response_model=SummaryResponse)
+async def get_summary(monthly_income: float = Query(..., gt=0, description="User's total monthly income.")):
+    """
+    Provides a detailed financial summary based on transaction data and user's income.
+    This endpoint powers the main analytics dashboard.
+    """
+    transactions = app_state["transactions"]
+    if not transactions:
+        raise HTTPException(status_code=404, detail="No transaction data available to generate a summary.")
+
+    return Response(content=build_summary(monthly_income), media_type="application/json")
+
+@app.get("/tips", response_model=TipsResponse)
+async def get_savings_tips():
+    """
+    Generates AI-powered, personalized savings tips and a dopamine boost message.
+    This endpoint delivers the cute, actionable advice to the user.
+    """
+    transactions = app_state["transactions"]
+    if not transactions:
+        raise HTTPException(status_code=404, detail="No transaction data available to generate tips.")
+
+    # Only the dopamine boost varies per request; the tips themselves are built at startup
+    boost = DOPAMINE_BOOSTS[_rng.randrange(_n_boosts)]
+    tips_response = dict(app_state["tips_template"], daily_dopamine_boost=boost)
+    return Response(content=orjson.dumps(tips_response), media_type="application/json")
 
 # --- To run the server locally ---
 # Command: uvicorn main:app --reload
+# Production: PROD=1 [WORKERS=n] python main.py
 if __name__ == "__main__":
     import uvicorn
-    print("Starting server at http://127.0.0.1:8000")
-    print("Swagger UI available at http://127.0.0.1:8000/docs")
-    uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
+    if os.getenv("PROD"):
+        # No reloader; use uvloop + httptools and one worker per core by default
+        workers = int(os.getenv("WORKERS", os.cpu_count() or 1))
+        print(f"Starting production server at http://0.0.0.0:8000 with {workers} workers")
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, loop="uvloop", http="httptools", workers=workers)
+    else:
+        print("Starting server at http://127.0.0.1:8000")
+        print("Swagger UI available at http://127.0.0.1:8000/docs")
+        uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,117 @@
+import json
+import random
+from collections import defaultdict
+from datetime import date, timedelta
+
+from main import (
+    TransactionRecord,
+    app_state,
+    build_summary,
+    build_transaction_arrays,
+    calculate_analytics,
+    load_state,
+    transactions_decoder,
+)
+
+
+def reference_analytics(transactions):
+    """The original pure-Python calculate_analytics, kept here to pin the kernel's output."""
+    if not transactions:
+        return 0, 0, {}, 0
+
+    total_spend = sum(t.amount for t in transactions if t.type == 'debit')
+    total_income = sum(t.amount for t in transactions if t.type == 'credit')
+
+    spend_by_category = defaultdict(float)
+    for t in transactions:
+        if t.type == 'debit':
+            spend_by_category[t.category] += t.amount
+
+    first_date = min(t.date for t in transactions)
+    last_date = max(t.date for t in transactions)
+    period_days = (last_date - first_date).days + 1
+
+    return total_spend, total_income, dict(spend_by_category), period_days
+
+
+def make_transactions(n, decimals, seed=0):
+    rng = random.Random(seed)
+    categories = ["Food Delivery", "Coffee", "Shopping", "Going Out", "Sutta", "Income"]
+    return [
+        TransactionRecord(
+            date=date(2025, 7, 1) + timedelta(days=rng.randrange(60)),
+            description="test",
+            amount=round(rng.uniform(0, 5000), decimals),
+            type=rng.choice(["debit", "credit"]),
+            category=rng.choice(categories),
+            payment_method="UPI",
+        )
+        for _ in range(n)
+    ]
+
+
+def rounded(analytics):
+    """Rounds the monetary values the way the endpoints do before serving them."""
+    total_spend, total_income, spend_by_category, period_days = analytics
+    return (
+        round(total_spend, 2),
+        round(total_income, 2),
+        {k: round(v, 2) for k, v in spend_by_category.items()},
+        period_days,
+    )
+
+
+def test_matches_reference_on_mock_data():
+    with open("mock_transactions.json", "rb") as f:
+        transactions = transactions_decoder.decode(f.read())
+    result = calculate_analytics(build_transaction_arrays(transactions))
+    assert result == reference_analytics(transactions)
+    assert list(result[2]) == list(reference_analytics(transactions)[2])
+
+
+def test_matches_reference_with_whole_paise():
+    transactions = make_transactions(2000, decimals=2)
+    assert build_transaction_arrays(transactions).amount_scale == 100
+    assert rounded(calculate_analytics(build_transaction_arrays(transactions))) == rounded(
+        reference_analytics(transactions)
+    )
+
+
+def test_matches_reference_with_sub_paise_amounts():
+    transactions = make_transactions(2000, decimals=3)
+    assert build_transaction_arrays(transactions).amount_scale == 1
+    assert calculate_analytics(build_transaction_arrays(transactions)) == reference_analytics(transactions)
+
+
+def test_huge_amounts_do_not_overflow():
+    transactions = make_transactions(10, decimals=2)
+    transactions[0].amount = 1e17
+    assert calculate_analytics(build_transaction_arrays(transactions)) == reference_analytics(transactions)
+
+
+def test_overflowing_totals_do_not_wrap():
+    # Each amount fits in int64 paise on its own, but their sum does not
+    transactions = make_transactions(2000, decimals=2)
+    for t in transactions:
+        t.type = "debit"
+        t.amount = 9e13
+    assert build_transaction_arrays(transactions).amount_scale == 1
+    assert calculate_analytics(build_transaction_arrays(transactions)) == reference_analytics(transactions)
+
+
+def test_empty_transactions():
+    assert calculate_analytics(build_transaction_arrays([])) == (0, 0, {}, 0)
+
+
+def test_load_state_invalidates_cached_summaries():
+    first = make_transactions(10, decimals=2, seed=1)
+    second = make_transactions(10, decimals=2, seed=2)
+    try:
+        load_state(first)
+        before = json.loads(build_summary(1000.0))
+        load_state(second)
+        after = json.loads(build_summary(1000.0))
+        assert after["total_spend"] == round(app_state["analytics"][0], 2)
+        assert after["total_spend"] != before["total_spend"]
+    finally:
+        load_state([])